@@ -3,17 +3,70 @@
  * Handles settings, API keys, and user preferences
  */
 
+import crypto from 'crypto';
 import fs from 'fs';
 import path from 'path';
 import os from 'os';
 import chalk from 'chalk';
 import inquirer from 'inquirer';
 
+const CACHE_TTL = 86400000; // 24 hours
+const MEMORY_CACHE_SIZE = 1024;
+
+// Parsed JSON files keyed by path, reused while the file is unchanged on disk.
+// Callers mutate what they load, so only copies ever leave the cache.
+const fileCache = new Map();
+
+// The config holds API keys, so never read or write it through a symlink.
+// O_NOFOLLOW does not exist on Windows.
+const NOFOLLOW = fs.constants.O_NOFOLLOW || 0;
+const READ_FLAGS = fs.constants.O_RDONLY | NOFOLLOW;
+const WRITE_FLAGS = fs.constants.O_WRONLY | fs.constants.O_CREAT | fs.constants.O_TRUNC | NOFOLLOW;
+
+function readJSON(file) {
+    const { mtimeNs, size } = fs.statSync(file, { bigint: true });
+    const cached = fileCache.get(file);
+    
+    if (cached && cached.mtimeNs === mtimeNs && cached.size === size) {
+        return structuredClone(cached.data);
+    }
+    
+    const fd = fs.openSync(file, READ_FLAGS);
+    try {
+        // fstat the open descriptor so the cache key matches exactly the bytes read
+        const stat = fs.fstatSync(fd, { bigint: true });
+        const buffer = Buffer.allocUnsafe(Number(stat.size));
+        const bytesRead = fs.readSync(fd, buffer, 0, buffer.length, 0);
+        const data = JSON.parse(buffer.toString('utf8', 0, bytesRead));
+        fileCache.set(file, { mtimeNs: stat.mtimeNs, size: stat.size, data });
+        return structuredClone(data);
+    } finally {
+        fs.closeSync(fd);
+    }
+}
+
+function writeJSON(file, data) {
+    // Fails with ELOOP on a symlink, dangling or not, instead of writing through it.
+    // Owner-only: the config holds API keys and the cache full answers.
+    const fd = fs.openSync(file, WRITE_FLAGS, 0o600);
+    try {
+        // The mode above only applies to new files; tighten older ones too
+        fs.fchmodSync(fd, 0o600);
+        fs.writeSync(fd, JSON.stringify(data));
+        const { mtimeNs, size } = fs.fstatSync(fd, { bigint: true });
+        fileCache.set(file, { mtimeNs, size, data: structuredClone(data) });
+    } finally {
+        fs.closeSync(fd);
+    }
+}
+
 export class ConfigManager {
     constructor() {
         this.configDir = path.join(os.homedir(), '.nubemsecurity');
         this.configFile = path.join(this.configDir, 'config.json');
         this.cacheFile = path.join(this.configDir, 'cache.json');
+        this.memoryCache = new Map();
+        this.configLocked = false;
         
         this.ensureConfigDir();
         this.loadConfig();
@@ -28,12 +81,16 @@ export class ConfigManager {
     loadConfig() {
         if (fs.existsSync(this.configFile)) {
             try {
-                const config = JSON.parse(fs.readFileSync(this.configFile, 'utf8'));
+                const config = readJSON(this.configFile);
                 this.config = config;
             } catch (error) {
-                console.log(chalk.yellow('⚠️  Config file corrupted. Creating new one.'));
                 this.config = this.getDefaultConfig();
-                this.saveConfig();
+                if (error.code === 'ELOOP') {
+                    this.lockConfig();
+                } else {
+                    console.error(chalk.yellow('⚠️  Config file corrupted. Creating new one.'));
+                    this.saveConfig();
+                }
             }
         } else {
             this.config = this.getDefaultConfig();
@@ -100,10 +157,25 @@ export class ConfigManager {
     }
 
     saveConfig() {
-        fs.writeFileSync(this.configFile, JSON.stringify(this.config, null, 2));
+        // A symlinked config is never written; settings live only in memory
+        if (this.configLocked) return false;
+        
+        try {
+            writeJSON(this.configFile, this.config);
+            return true;
+        } catch (error) {
+            if (error.code !== 'ELOOP') throw error;
+            this.lockConfig();
+            return false;
+        }
     }
 
-    async selectProvider() {
+    lockConfig() {
+        this.configLocked = true;
+        console.error(chalk.yellow('⚠️  Config file is a symlink. Using defaults; settings will not be saved.'));
+    }
+
+    getAvailableProviders() {
         const availableProviders = [];
         
         if (this.config.apiKeys.openai) {
@@ -119,6 +191,12 @@ export class ConfigManager {
             availableProviders.push('deepseek');
         }
         
+        return availableProviders;
+    }
+
+    async selectProvider() {
+        const availableProviders = this.getAvailableProviders();
+        
         // If only one provider is configured, use it
         if (availableProviders.length === 1) {
             this.config.provider = availableProviders[0];
@@ -158,10 +236,14 @@ export class ConfigManager {
 
     async saveAPIKey(provider, apiKey) {
         this.config.apiKeys[provider] = apiKey;
-        this.saveConfig();
+        const saved = this.saveConfig();
         this.applyConfig();
         
-        console.log(chalk.green(`✓ API key saved for ${provider}`));
+        if (saved) {
+            console.log(chalk.green(`✓ API key saved for ${provider}`));
+        } else {
+            console.log(chalk.yellow(`⚠️  API key for ${provider} will only be used for this session`));
+        }
     }
 
     get botName() {
@@ -176,7 +258,7 @@ export class ConfigManager {
     loadCache() {
         if (fs.existsSync(this.cacheFile)) {
             try {
-                return JSON.parse(fs.readFileSync(this.cacheFile, 'utf8'));
+                return readJSON(this.cacheFile);
             } catch (error) {
                 return {};
             }
@@ -185,17 +267,20 @@ export class ConfigManager {
     }
 
     saveCache(cache) {
-        fs.writeFileSync(this.cacheFile, JSON.stringify(cache, null, 2));
+        writeJSON(this.cacheFile, cache);
     }
 
     getCachedResponse(prompt) {
         if (!this.config.settings.cacheEnabled) return null;
         
-        const cache = this.loadCache();
         const hash = this.hashPrompt(prompt);
         
-        if (cache[hash] && cache[hash].timestamp > Date.now() - 86400000) { // 24 hours
-            return cache[hash].response;
+        // In-memory LRU first, the cache file only on a miss
+        const entry = this.memoryCache.get(hash) || this.loadCache()[hash];
+        
+        if (entry && entry.timestamp > Date.now() - CACHE_TTL) {
+            this.rememberResponse(hash, entry);
+            return entry.response;
         }
         
         return null;
@@ -211,6 +296,7 @@ export class ConfigManager {
             response: response,
             timestamp: Date.now()
         };
+        this.rememberResponse(hash, cache[hash]);
         
         // Limit cache size
         const keys = Object.keys(cache);
@@ -223,14 +309,17 @@ export class ConfigManager {
         this.saveCache(cache);
     }
 
+    rememberResponse(hash, entry) {
+        // Re-insert so the Map's insertion order doubles as LRU order
+        this.memoryCache.delete(hash);
+        this.memoryCache.set(hash, entry);
+        
+        if (this.memoryCache.size > MEMORY_CACHE_SIZE) {
+            this.memoryCache.delete(this.memoryCache.keys().next().value);
+        }
+    }
+
     hashPrompt(prompt) {
-        // Simple hash function for caching
-        let hash = 0;
-        for (let i = 0; i < prompt.length; i++) {
-            const char = prompt.charCodeAt(i);
-            hash = ((hash << 5) - hash) + char;
-            hash = hash & hash;
-        }
-        return hash.toString();
+        return crypto.createHash('sha256').update(prompt).digest('hex');
     }
 }
\ No newline at end of file
@@ -106,10 +106,9 @@ class NubemSecurityRAG {
     }
 
     async handleCommand(command) {
-        const cmd = command.toLowerCase().trim();
-        const args = cmd.split(' ').slice(1);
+        const [name, ...args] = command.trim().split(' ');
         
-        switch (cmd.split(' ')[0]) {
+        switch (name.toLowerCase()) {
             case '/help':
                 this.showHelp();
                 break;
@@ -11,12 +11,31 @@ import inquirer from 'inquirer';
 import { program } from 'commander';
 import dotenv from 'dotenv';
 import ora from 'ora';
-import { AIProvider } from './providers/index.js';
+import { AIProvider, detectProviders, isImplemented } from './providers/index.js';
 import { SecurityTools } from './tools/index.js';
 import { ConfigManager } from './config/manager.js';
+import { BatchWindow, OutputBuffer } from './utils/optimization.js';
+import readline from 'readline';
+import { once } from 'events';
 import { fileURLToPath } from 'url';
 import { dirname, join } from 'path';
 
+// Once the history grows past this many characters the oldest exchanges
+// are folded into a short running summary
+const HISTORY_MAX_CHARS = parseInt(process.env.HISTORY_MAX_CHARS || '8000');
+
+const COMMANDS = new Set(['/help', '/clear', '/reset', '/tools', '/compare', '/exit', '/quit']);
+
+// Split a slash command into its lowercased name and its untouched arguments
+function parseCommand(command) {
+    const trimmed = command.trim();
+    const space = trimmed.indexOf(' ');
+    return {
+        name: (space === -1 ? trimmed : trimmed.slice(0, space)).toLowerCase(),
+        args: space === -1 ? '' : trimmed.slice(space + 1).trim()
+    };
+}
+
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
 
@@ -41,9 +60,17 @@ class NubemSecurity {
         this.aiProvider = null;
         this.securityTools = new SecurityTools();
         this.conversationHistory = [];
+        this.conversationSummary = '';
+        this.historyTrim = Promise.resolve();
     }
 
     async initialize() {
+        // Piped stdin gets no banner and no prompts, which would consume the input
+        if (!process.stdin.isTTY) {
+            this.initializePiped();
+            return;
+        }
+        
         console.clear();
         console.log(banner);
         
@@ -59,6 +86,22 @@ class NubemSecurity {
         console.log(chalk.green('✓ NubemSecurity initialized successfully!\n'));
     }
 
+    initializePiped() {
+        // DEFAULT_PROVIDER comes from the config file or --provider
+        this.aiProvider = new AIProvider();
+        
+        // Like selectProvider(), fall back to the only provider that has a key
+        const available = this.config.getAvailableProviders();
+        if (!this.aiProvider.isConfigured() && available.length === 1) {
+            this.aiProvider = new AIProvider(available[0]);
+        }
+        
+        if (!this.aiProvider.isConfigured()) {
+            console.error(chalk.red(`❌ No API key configured for ${this.aiProvider.provider}. Run nubemsec interactively to set one up.`));
+            process.exit(1);
+        }
+    }
+
     async setupAPIKey() {
         const { apiKey } = await inquirer.prompt([
             {
@@ -69,6 +112,12 @@ class NubemSecurity {
             }
         ]);
         
+        // Warn, but keep the user's choice, if the key looks like another provider's
+        const candidates = detectProviders(apiKey);
+        if (candidates.length > 0 && !candidates.includes(this.aiProvider.provider)) {
+            console.log(chalk.yellow(`⚠️  This looks like a ${candidates.join('/')} key, not a ${this.aiProvider.provider} key.`));
+        }
+        
         this.aiProvider.setAPIKey(apiKey);
         await this.config.saveAPIKey(this.aiProvider.provider, apiKey);
     }
@@ -99,9 +148,9 @@ class NubemSecurity {
     }
 
     async handleCommand(command) {
-        const cmd = command.toLowerCase().trim();
+        const { name, args } = parseCommand(command);
         
-        switch (cmd) {
+        switch (name) {
             case '/help':
                 this.showHelp();
                 break;
@@ -110,12 +159,17 @@ class NubemSecurity {
                 console.log(banner);
                 break;
             case '/reset':
+                await this.historyTrim;
                 this.conversationHistory = [];
+                this.conversationSummary = '';
                 console.log(chalk.yellow('🔄 Conversation reset.\n'));
                 break;
             case '/tools':
                 this.securityTools.showAvailableTools();
                 break;
+            case '/compare':
+                await this.compareProviders(args);
+                break;
             case '/exit':
             case '/quit':
                 console.log(chalk.cyan('\n👋 Goodbye! Stay secure!\n'));
@@ -133,47 +187,152 @@ class NubemSecurity {
         console.log(chalk.white('  /clear   - Clear the screen'));
         console.log(chalk.white('  /reset   - Reset conversation history'));
         console.log(chalk.white('  /tools   - Show available security tools'));
+        console.log(chalk.white('  /compare - Ask every configured provider at once'));
         console.log(chalk.white('  /exit    - Exit NubemSecurity\n'));
     }
 
+    async compareProviders(question) {
+        if (!question) {
+            console.log(chalk.red('Please provide a question to compare.\n'));
+            return;
+        }
+
+        // Placeholder integrations (Grok) have no real answer to compare
+        const providers = this.config.getAvailableProviders().filter(isImplemented);
+        if (providers.length < 2) {
+            console.log(chalk.yellow('⚠️  Configure at least two providers to compare answers.\n'));
+            return;
+        }
+
+        const spinner = ora(`Asking ${providers.length} providers...`).start();
+        
+        // Make sure the previous turn's summarization has finished
+        await this.historyTrim;
+        
+        const toolContext = this.securityTools.getToolContext(question);
+        const enhancedPrompt = this.enhancePromptWithSecurity(question, toolContext);
+        
+        // Requests run concurrently, so the wait is the slowest provider rather than the sum
+        const results = await Promise.allSettled(
+            providers.map(provider =>
+                new AIProvider(provider).generateResponse(enhancedPrompt, this.getContextHistory())
+            )
+        );
+        
+        spinner.stop();
+        
+        const output = results.map((result, index) => {
+            const body = result.status === 'fulfilled'
+                ? chalk.white(result.value)
+                : chalk.red(`❌ Error: ${result.reason.message}`);
+            return `${chalk.blue(`\n${providers[index]}:`)}\n${body}\n`;
+        });
+        process.stdout.write(output.join('') + '\n');
+    }
+
     async processInput(input) {
         const spinner = ora('Thinking...').start();
+        const output = new OutputBuffer(process.stdout, { format: chalk.white });
         
         try {
+            // Make sure the previous turn's summarization has finished
+            await this.historyTrim;
+            const history = this.getContextHistory();
+            
             // Check if input is asking about security tools
             const toolContext = this.securityTools.getToolContext(input);
             
             // Prepare the prompt with security context
             const enhancedPrompt = this.enhancePromptWithSecurity(input, toolContext);
             
-            // Get AI response
-            const response = await this.aiProvider.generateResponse(
-                enhancedPrompt,
-                this.conversationHistory
-            );
+            // Identical question in the same conversation state can reuse the last answer
+            const cacheKey = JSON.stringify([this.aiProvider.provider, history, enhancedPrompt]);
+            let response = this.config.getCachedResponse(cacheKey);
+            let streamed = false;
+            
+            if (response === null) {
+                // Get AI response, printing tokens as they stream in
+                response = await this.aiProvider.generateResponse(
+                    enhancedPrompt,
+                    history,
+                    (token) => {
+                        if (!streamed) {
+                            spinner.stop();
+                            console.log(chalk.blue(`\n${this.config.botName}:`));
+                            streamed = true;
+                        }
+                        output.write(token);
+                    }
+                );
+                
+                // Caching is best-effort; a failed write must not lose the answer
+                try {
+                    this.config.setCachedResponse(cacheKey, response);
+                } catch (error) {
+                    // Ignore cache write failures (read-only HOME, full disk, ...)
+                }
+            }
             
             spinner.stop();
             
             // Display response
-            console.log(chalk.blue(`\n${this.config.botName}:`));
-            console.log(chalk.white(response));
-            console.log();
+            if (streamed) {
+                output.flush();
+                process.stdout.write('\n\n');
+            } else {
+                process.stdout.write(`${chalk.blue(`\n${this.config.botName}:`)}\n${chalk.white(response)}\n\n`);
+            }
             
             // Update conversation history
             this.conversationHistory.push({ role: 'user', content: input });
             this.conversationHistory.push({ role: 'assistant', content: response });
             
-            // Keep history limited
-            if (this.conversationHistory.length > 20) {
-                this.conversationHistory = this.conversationHistory.slice(-20);
-            }
+            // Summarize old turns in the background while the user reads the answer
+            this.historyTrim = this.trimHistory();
             
         } catch (error) {
             spinner.stop();
+            output.flush();
             console.log(chalk.red(`\n❌ Error: ${error.message}\n`));
         }
     }
 
+    getContextHistory() {
+        if (!this.conversationSummary) {
+            return this.conversationHistory;
+        }
+        return [
+            { role: 'system', content: `Earlier in this conversation: ${this.conversationSummary}` },
+            ...this.conversationHistory
+        ];
+    }
+
+    async trimHistory() {
+        const size = () => this.conversationHistory.reduce((total, msg) => total + msg.content.length, 0);
+        const evicted = [];
+        
+        // Always keep the latest exchange verbatim
+        while (size() > HISTORY_MAX_CHARS && this.conversationHistory.length > 2) {
+            evicted.push(...this.conversationHistory.splice(0, 2));
+        }
+        
+        if (evicted.length === 0) return;
+        
+        const transcript = evicted.map(msg => `${msg.role}: ${msg.content}`).join('\n');
+        const previous = this.conversationSummary ? `Previous summary: ${this.conversationSummary}\n\n` : '';
+        
+        try {
+            this.conversationSummary = await this.aiProvider.generateResponse(
+                `${previous}Summarize briefly the conversation so far, keeping technical details needed to continue it:\n${transcript}`,
+                [],
+                null,
+                200
+            );
+        } catch (error) {
+            // The evicted turns are simply dropped if summarization fails
+        }
+    }
+
     enhancePromptWithSecurity(input, toolContext) {
         let enhanced = input;
         
@@ -191,9 +350,64 @@ Please provide a detailed, technical response focusing on practical implementati
         return enhanced;
     }
 
+    async runPiped() {
+        // Prompts piped on stdin are answered in small concurrent batches;
+        // known commands run in order between them
+        const rl = readline.createInterface({ input: process.stdin });
+        let exiting = false;
+        const batcher = new BatchWindow(lines => exiting || this.answerBatch(lines), {
+            maxBatch: 8,
+            maxWaitMs: 10,
+            onError: (error) => console.error(chalk.red(`❌ Error: ${error.message}`))
+        });
+        
+        rl.on('line', (line) => {
+            const input = line.trim();
+            if (!input) return;
+            
+            // Anything else, including questions starting with a path, is a prompt
+            if (!COMMANDS.has(parseCommand(input).name)) {
+                batcher.push(input);
+                return;
+            }
+            
+            batcher.after(async () => {
+                if (exiting) return;
+                if (await this.handleCommand(input) === 'exit') {
+                    exiting = true;
+                    rl.close();
+                }
+            });
+        });
+        
+        await once(rl, 'close');
+        await batcher.flush();
+    }
+
+    async answerBatch(lines) {
+        // Piped prompts are independent questions, so a batch is sent concurrently
+        const results = await Promise.allSettled(
+            lines.map(line => {
+                const toolContext = this.securityTools.getToolContext(line);
+                return this.aiProvider.generateResponse(this.enhancePromptWithSecurity(line, toolContext));
+            })
+        );
+        
+        // One write per batch rather than several per answer
+        const output = results.map(result => (result.status === 'fulfilled'
+            ? `${chalk.blue(`\n${this.config.botName}:`)}\n${chalk.white(result.value)}\n\n`
+            : chalk.red(`\n❌ Error: ${result.reason.message}\n\n`)));
+        process.stdout.write(output.join(''));
+    }
+
     async run() {
         await this.initialize();
-        await this.startConversation();
+        
+        if (process.stdin.isTTY) {
+            await this.startConversation();
+        } else {
+            await this.runPiped();
+        }
     }
 }
 
@@ -201,7 +415,11 @@ Please provide a detailed, technical response focusing on practical implementati
 program
     .name('nubemsec')
     .description('NubemSecurity - AI-powered cybersecurity assistant')
-    .version('0.1.0');
+    .version('0.1.0')
+    .addHelpText('after', `
+When stdin is piped, each line is answered as an independent question
+without conversation history. Commands such as /help, /tools and /exit
+still work and run in input order.`);
 
 program
     .option('-p, --provider <provider>', 'AI provider (openai, gemini, grok, deepseek)')
@@ -220,10 +438,5 @@ program
         await app.run();
     });
 
-program.parse();
-
-// If no command provided, run interactive mode
-if (!process.argv.slice(2).length) {
-    const app = new NubemSecurity();
-    app.run().catch(console.error);
-}
\ No newline at end of file
+// The root action also runs when no arguments are given
+program.parse();
\ No newline at end of file
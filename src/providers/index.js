@@ -3,8 +3,130 @@
  * Handles multiple AI providers (OpenAI, Gemini, Grok, DeepSeek)
  */
 
-import OpenAI from 'openai';
-import { GoogleGenerativeAI } from '@google/generative-ai';
+import crypto from 'crypto';
+import https from 'https';
+
+// Shared keep-alive agent so consecutive turns reuse the provider's TLS connection
+const httpAgent = new https.Agent({ keepAlive: true, maxSockets: 16 });
+
+const SYSTEM_PROMPT = `You are NubemSecurity, an advanced AI cybersecurity assistant specialized in:
+- Penetration testing and ethical hacking
+- Security vulnerability analysis
+- Network security and monitoring
+- Malware analysis and reverse engineering
+- Security tools (Nmap, Metasploit, Burp Suite, etc.)
+- Incident response and forensics
+- Security best practices and compliance
+
+Always provide technical, accurate, and actionable responses. Include command examples when relevant.
+Focus on ethical hacking and defensive security only.`;
+
+// Kept byte-identical across turns so providers can reuse the cached
+// prompt prefix; OpenAI additionally routes on this key
+const PROMPT_CACHE_KEY = `nubemsec-${crypto.createHash('sha256').update(SYSTEM_PROMPT).digest('hex').slice(0, 16)}`;
+
+// Known API key prefixes, keyed on the first 3-4 characters of the key,
+// mapped to every provider that issues keys with that prefix
+const KEY_PREFIXES = new Map([
+    ['AIza', ['gemini']],
+    ['xai-', ['grok']],
+    ['sk-', ['openai', 'deepseek']]
+]);
+
+/**
+ * List the providers an API key may belong to, judging by its prefix.
+ * Returns an empty array when the key does not match any known prefix.
+ */
+export function detectProviders(apiKey = '') {
+    return KEY_PREFIXES.get(apiKey.slice(0, 4)) || KEY_PREFIXES.get(apiKey.slice(0, 3)) || [];
+}
+
+const RETRYABLE_STATUS = new Set([429, 500, 502, 503, 504]);
+
+// Server-requested wait in ms, from the RetryInfo detail that newer Gemini
+// SDKs attach to a 429 (e.g. retryDelay: '13s'). The 0.2.x SDK exposes
+// neither that nor the Retry-After header, so null means "use backoff".
+function serverRetryDelay(error) {
+    const info = error.errorDetails?.find(detail => detail['@type']?.endsWith('RetryInfo'));
+    const seconds = parseFloat(info?.retryDelay);
+    return Number.isFinite(seconds) ? seconds * 1000 : null;
+}
+
+/**
+ * Retry a request on rate limits, 5xx responses and network failures
+ * using exponential backoff with ±20% jitter.
+ */
+export async function withRetry(fn, { retries = 5, baseDelayMs = 300 } = {}) {
+    for (let attempt = 0; ; attempt++) {
+        try {
+            return await fn();
+        } catch (error) {
+            // The Gemini SDK reports the HTTP status and fetch failures only
+            // inside its wrapped message, e.g. '...: [503 Service Unavailable] ...'
+            // or '[GoogleGenerativeAI Error]: Error fetching from <url>: fetch failed'
+            const message = error.message || '';
+            const status = error.status ?? Number(/\[(\d{3}) /.exec(message)?.[1]);
+            const retryable = RETRYABLE_STATUS.has(status) || message.includes('fetch failed');
+            
+            if (!retryable || attempt >= retries) {
+                throw error;
+            }
+            
+            const backoff = baseDelayMs * 2 ** attempt * (0.8 + Math.random() * 0.4);
+            const delay = serverRetryDelay(error) ?? backoff;
+            await new Promise(resolve => setTimeout(resolve, delay));
+        }
+    }
+}
+
+// Environment variables holding each provider's API key, in priority order
+const API_KEY_ENV = {
+    openai: ['OPENAI_API_KEY'],
+    // Support multiple environment variable names for Gemini
+    gemini: ['GOOGLE_AI_API_KEY', 'GEMINI_API_KEY', 'GOOGLE_API_KEY'],
+    grok: ['GROK_API_KEY'],
+    deepseek: ['DEEPSEEK_API_KEY']
+};
+
+const MODELS = {
+    openai: 'gpt-4-turbo-preview',
+    gemini: 'gemini-pro',
+    deepseek: 'deepseek-chat'
+};
+
+const CLIENT_FACTORIES = {
+    openai: async (apiKey) => {
+        const { default: OpenAI } = await import('openai');
+        // The SDK retries 429/5xx itself with jittered backoff and honors Retry-After
+        return new OpenAI({ apiKey, httpAgent, maxRetries: 5 });
+    },
+    gemini: async (apiKey) => {
+        const { GoogleGenerativeAI } = await import('@google/generative-ai');
+        return new GoogleGenerativeAI(apiKey);
+    },
+    // DeepSeek uses OpenAI-compatible API
+    deepseek: async (apiKey) => {
+        const { default: OpenAI } = await import('openai');
+        return new OpenAI({ apiKey, baseURL: 'https://api.deepseek.com/v1', httpAgent, maxRetries: 5 });
+    }
+};
+
+/**
+ * Whether the provider has a working integration rather than a placeholder.
+ */
+export function isImplemented(provider) {
+    return provider in CLIENT_FACTORIES;
+}
+
+const RESPONDERS = {
+    openai: (ai, prompt, history, onToken, maxTokens) =>
+        ai.generateOpenAIResponse(prompt, history, SYSTEM_PROMPT, onToken, maxTokens),
+    deepseek: (ai, prompt, history, onToken, maxTokens) =>
+        ai.generateOpenAIResponse(prompt, history, SYSTEM_PROMPT, onToken, maxTokens),
+    gemini: (ai, prompt, history, onToken, maxTokens) =>
+        ai.generateGeminiResponse(prompt, history, SYSTEM_PROMPT, onToken, maxTokens),
+    grok: async () => 'Grok integration coming soon. Please use OpenAI or Gemini for now.'
+};
 
 export class AIProvider {
     constructor(provider = process.env.DEFAULT_PROVIDER || 'openai') {
@@ -15,122 +137,127 @@ export class AIProvider {
     }
 
     initializeProvider() {
-        switch (this.provider) {
-            case 'openai':
-                this.apiKey = process.env.OPENAI_API_KEY;
-                if (this.apiKey) {
-                    this.client = new OpenAI({ apiKey: this.apiKey });
-                }
-                break;
-            
-            case 'gemini':
-                // Support multiple environment variable names for Gemini
-                this.apiKey = process.env.GOOGLE_AI_API_KEY || process.env.GEMINI_API_KEY || process.env.GOOGLE_API_KEY;
-                if (this.apiKey) {
-                    this.client = new GoogleGenerativeAI(this.apiKey);
-                }
-                break;
-            
-            case 'grok':
-                // Grok implementation (when available)
-                this.apiKey = process.env.GROK_API_KEY;
-                console.log('Grok provider selected (implementation pending)');
-                break;
-            
-            case 'deepseek':
-                // DeepSeek uses OpenAI-compatible API
-                this.apiKey = process.env.DEEPSEEK_API_KEY;
-                if (this.apiKey) {
-                    this.client = new OpenAI({
-                        apiKey: this.apiKey,
-                        baseURL: 'https://api.deepseek.com/v1'
-                    });
-                }
-                break;
-            
-            default:
-                throw new Error(`Unknown provider: ${this.provider}`);
+        const envVars = API_KEY_ENV[this.provider];
+        if (!envVars) {
+            throw new Error(`Unknown provider: ${this.provider}`);
+        }
+        
+        this.apiKey = envVars.map(name => process.env[name]).find(Boolean);
+        
+        // Bind the provider-specific pieces once instead of branching every turn
+        this.model = MODELS[this.provider];
+        this.respond = RESPONDERS[this.provider];
+        
+        // Request fields that stay the same every turn, built once
+        this.baseParams = {
+            model: this.model,
+            max_tokens: parseInt(process.env.MAX_TOKENS || '2000'),
+            temperature: parseFloat(process.env.TEMPERATURE || '0.7'),
+            stream: true,
+            ...(this.provider === 'openai' && { prompt_cache_key: PROMPT_CACHE_KEY })
+        };
+        
+        if (this.provider === 'grok') {
+            // Grok implementation (when available)
+            console.log('Grok provider selected (implementation pending)');
         }
     }
 
+    /**
+     * Create the SDK client on first use. The SDKs are imported lazily so
+     * starting the CLI (banner, provider selection, key setup) does not
+     * pay for loading them.
+     */
+    async getClient() {
+        if (!this.client && CLIENT_FACTORIES[this.provider]) {
+            this.client = await CLIENT_FACTORIES[this.provider](this.apiKey);
+        }
+        return this.client;
+    }
+
     isConfigured() {
         return this.apiKey !== null && this.apiKey !== undefined && this.apiKey !== '';
     }
 
     setAPIKey(apiKey) {
         this.apiKey = apiKey;
-        this.initializeProvider();
+        this.client = null;
     }
 
-    async generateResponse(prompt, history = []) {
+    /**
+     * Generate a response for the prompt. Responses are always streamed;
+     * when onToken is given each text chunk is passed to it as it
+     * arrives. The full text is returned at the end. maxTokens
+     * overrides the configured MAX_TOKENS for this call.
+     */
+    async generateResponse(prompt, history = [], onToken = null, maxTokens = null) {
         if (!this.isConfigured()) {
             throw new Error('API key not configured');
         }
 
-        const systemPrompt = `You are NubemSecurity, an advanced AI cybersecurity assistant specialized in:
-- Penetration testing and ethical hacking
-- Security vulnerability analysis
-- Network security and monitoring
-- Malware analysis and reverse engineering
-- Security tools (Nmap, Metasploit, Burp Suite, etc.)
-- Incident response and forensics
-- Security best practices and compliance
-
-Always provide technical, accurate, and actionable responses. Include command examples when relevant.
-Focus on ethical hacking and defensive security only.`;
-
         try {
-            switch (this.provider) {
-                case 'openai':
-                case 'deepseek':
-                    return await this.generateOpenAIResponse(prompt, history, systemPrompt);
-                
-                case 'gemini':
-                    return await this.generateGeminiResponse(prompt, history, systemPrompt);
-                
-                case 'grok':
-                    return 'Grok integration coming soon. Please use OpenAI or Gemini for now.';
-                
-                default:
-                    throw new Error('Provider not implemented');
-            }
+            return await this.respond(this, prompt, history, onToken, maxTokens);
         } catch (error) {
             throw new Error(`AI Provider Error: ${error.message}`);
         }
     }
 
-    async generateOpenAIResponse(prompt, history, systemPrompt) {
+    async generateOpenAIResponse(prompt, history, systemPrompt, onToken, maxTokens) {
         const messages = [
             { role: 'system', content: systemPrompt },
             ...history,
             { role: 'user', content: prompt }
         ];
 
-        const completion = await this.client.chat.completions.create({
-            model: this.provider === 'deepseek' ? 'deepseek-chat' : 'gpt-4-turbo-preview',
-            messages: messages,
-            max_tokens: parseInt(process.env.MAX_TOKENS || '2000'),
-            temperature: parseFloat(process.env.TEMPERATURE || '0.7')
-        });
+        const params = { ...this.baseParams, messages };
+        if (maxTokens) {
+            params.max_tokens = maxTokens;
+        }
 
-        return completion.choices[0].message.content;
+        const client = await this.getClient();
+        
+        // Always stream, even without onToken: the body is parsed chunk by
+        // chunk as it arrives instead of as one large JSON document at EOF
+        const stream = await client.chat.completions.create(params);
+        let text = '';
+        for await (const chunk of stream) {
+            const delta = chunk.choices[0]?.delta?.content;
+            if (delta) {
+                text += delta;
+                onToken?.(delta);
+            }
+        }
+        return text;
     }
 
-    async generateGeminiResponse(prompt, history, systemPrompt) {
-        const model = this.client.getGenerativeModel({ model: 'gemini-pro' });
+    async generateGeminiResponse(prompt, history, systemPrompt, onToken, maxTokens) {
+        const client = await this.getClient();
+        const model = client.getGenerativeModel({
+            model: this.model,
+            ...(maxTokens && { generationConfig: { maxOutputTokens: maxTokens } })
+        });
         
         // Prepare conversation context
         let fullPrompt = systemPrompt + '\n\n';
         
         // Add history
+        const speakers = { user: 'User', assistant: 'Assistant', system: 'Context' };
         history.forEach(msg => {
-            fullPrompt += `${msg.role === 'user' ? 'User' : 'Assistant'}: ${msg.content}\n`;
+            fullPrompt += `${speakers[msg.role] || 'Assistant'}: ${msg.content}\n`;
         });
         
         fullPrompt += `User: ${prompt}\nAssistant:`;
         
-        const result = await model.generateContent(fullPrompt);
-        const response = await result.response;
-        return response.text();
+        // Only the initial request is retried, so no partial output is repeated
+        const result = await withRetry(() => model.generateContentStream(fullPrompt));
+        let text = '';
+        for await (const chunk of result.stream) {
+            const delta = chunk.text();
+            if (delta) {
+                text += delta;
+                onToken?.(delta);
+            }
+        }
+        return text;
     }
 }
\ No newline at end of file
@@ -97,3 +97,85 @@ export class MemoryOptimizer {
     return usage.heapUsed > threshold;
   }
 }
+
+export class BatchWindow {
+  // Collects items that arrive close together and hands them to the
+  // handler as one batch, once maxBatch items are queued or maxWaitMs passes.
+  // A failing batch is reported to onError and does not stop later batches.
+  constructor(handler, { maxBatch = 8, maxWaitMs = 10, onError = (error) => console.error(error) } = {}) {
+    this.handler = handler;
+    this.onError = onError;
+    this.maxBatch = maxBatch;
+    this.maxWaitMs = maxWaitMs;
+    this.items = [];
+    this.timer = null;
+    this.pending = Promise.resolve();
+  }
+  
+  push(item) {
+    this.items.push(item);
+    
+    if (this.items.length >= this.maxBatch) {
+      this.flush();
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => this.flush(), this.maxWaitMs);
+    }
+  }
+  
+  flush() {
+    clearTimeout(this.timer);
+    this.timer = null;
+    
+    if (this.items.length > 0) {
+      const batch = this.items;
+      this.items = [];
+      // Batches run one after another so output keeps the input order
+      this.pending = this.pending
+        .then(() => this.handler(batch))
+        .catch((error) => this.onError(error, batch));
+    }
+    
+    return this.pending;
+  }
+  
+  // Runs task once every batch queued so far is done, keeping input order
+  after(task) {
+    this.flush();
+    this.pending = this.pending
+      .then(task)
+      .catch((error) => this.onError(error, []));
+    return this.pending;
+  }
+}
+
+export class OutputBuffer {
+  // Coalesces many small writes (e.g. streamed tokens) into fewer write
+  // calls, flushing at line ends or after flushMs, whichever comes first
+  constructor(stream = process.stdout, { flushMs = 16, format = (text) => text } = {}) {
+    this.stream = stream;
+    this.flushMs = flushMs;
+    this.format = format;
+    this.chunks = [];
+    this.timer = null;
+  }
+  
+  write(text) {
+    this.chunks.push(text);
+    
+    if (text.includes('\n')) {
+      this.flush();
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => this.flush(), this.flushMs);
+    }
+  }
+  
+  flush() {
+    clearTimeout(this.timer);
+    this.timer = null;
+    
+    if (this.chunks.length > 0) {
+      this.stream.write(this.format(this.chunks.join('')));
+      this.chunks = [];
+    }
+  }
+}
@@ -0,0 +1,121 @@
+/**
+ * Unit tests for the configuration manager's file handling
+ */
+
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { ConfigManager } from '../src/config/manager.js';
+
+// Keep the ESM-only UI dependencies out of the test run
+jest.mock('chalk', () => {
+    const identity = (text) => text;
+    return { __esModule: true, default: { yellow: identity, green: identity, red: identity } };
+});
+jest.mock('inquirer', () => ({ __esModule: true, default: { prompt: jest.fn() } }));
+
+describe('ConfigManager', () => {
+    const originalEnv = { ...process.env };
+    let home;
+    let configFile;
+    
+    beforeEach(() => {
+        home = fs.mkdtempSync(path.join(os.tmpdir(), 'nubemsec-test-'));
+        process.env.HOME = home;
+        configFile = path.join(home, '.nubemsecurity', 'config.json');
+        fs.mkdirSync(path.dirname(configFile), { recursive: true });
+        console.log.mockClear();
+    });
+    
+    afterEach(() => {
+        // Restore in place; replacing process.env would detach it from os.homedir()
+        for (const key of Object.keys(process.env)) {
+            if (!(key in originalEnv)) delete process.env[key];
+        }
+        Object.assign(process.env, originalEnv);
+        fs.rmSync(home, { recursive: true, force: true });
+    });
+    
+    const logged = (text) => console.log.mock.calls.flat().some(line => String(line).includes(text));
+    
+    describe('parsed file cache', () => {
+        test('a second ConfigManager sees a write from the first', () => {
+            const first = new ConfigManager();
+            first.config.botName = 'Written';
+            first.saveConfig();
+            
+            expect(new ConfigManager().botName).toBe('Written');
+        });
+        
+        test('an edit made outside the CLI is picked up', () => {
+            new ConfigManager();
+            
+            const onDisk = JSON.parse(fs.readFileSync(configFile, 'utf8'));
+            onDisk.botName = 'EditedByHandWithALongerName';
+            fs.writeFileSync(configFile, JSON.stringify(onDisk));
+            
+            expect(new ConfigManager().botName).toBe('EditedByHandWithALongerName');
+        });
+        
+        test('changes to a loaded object do not leak into the next read', () => {
+            const config = new ConfigManager();
+            config.setCachedResponse('prompt', 'answer');
+            
+            const cache = config.loadCache();
+            cache.injected = { response: 'unsaved', timestamp: Date.now() };
+            for (const entry of Object.values(cache)) entry.response = 'mutated';
+            
+            const reloaded = config.loadCache();
+            expect(reloaded.injected).toBeUndefined();
+            expect(Object.values(reloaded).map(entry => entry.response)).toEqual(['answer']);
+        });
+    });
+    
+    describe('symlink protection', () => {
+        test('a regular config file round-trips with owner-only permissions', () => {
+            const config = new ConfigManager();
+            config.config.botName = 'RoundTrip';
+            
+            expect(config.saveConfig()).toBe(true);
+            expect(config.configLocked).toBe(false);
+            expect(JSON.parse(fs.readFileSync(configFile, 'utf8')).botName).toBe('RoundTrip');
+            expect(fs.statSync(configFile).mode & 0o777).toBe(0o600);
+        });
+        
+        test('a symlinked config is locked and its target left unchanged', () => {
+            const target = path.join(home, 'target.json');
+            fs.writeFileSync(target, '{"keep":"me"}');
+            fs.symlinkSync(target, configFile);
+            
+            const config = new ConfigManager();
+            
+            expect(config.configLocked).toBe(true);
+            expect(config.saveConfig()).toBe(false);
+            expect(fs.readFileSync(target, 'utf8')).toBe('{"keep":"me"}');
+        });
+        
+        test('a dangling symlinked config is locked and nothing is created', () => {
+            const target = path.join(home, 'missing.json');
+            fs.symlinkSync(target, configFile);
+            
+            const config = new ConfigManager();
+            
+            expect(config.configLocked).toBe(true);
+            expect(fs.existsSync(target)).toBe(false);
+        });
+        
+        test('saveAPIKey reports session-only storage when the config is locked', async () => {
+            const target = path.join(home, 'target.json');
+            fs.writeFileSync(target, '{}');
+            fs.symlinkSync(target, configFile);
+            
+            const config = new ConfigManager();
+            await config.saveAPIKey('openai', 'sk-test');
+            
+            expect(logged('only be used for this session')).toBe(true);
+            expect(logged('API key saved')).toBe(false);
+            expect(fs.readFileSync(target, 'utf8')).toBe('{}');
+            expect(process.env.OPENAI_API_KEY).toBe('sk-test');
+        });
+    });
+});
@@ -0,0 +1,118 @@
+/**
+ * Unit tests for the batching and output helpers
+ */
+
+import { BatchWindow, OutputBuffer } from '../src/utils/optimization.js';
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+describe('BatchWindow', () => {
+    test('flushes as soon as maxBatch items are queued', async () => {
+        const batches = [];
+        const batcher = new BatchWindow(async (batch) => batches.push(batch), { maxBatch: 2, maxWaitMs: 1000 });
+        
+        batcher.push('a');
+        batcher.push('b');
+        await batcher.pending;
+        
+        expect(batches).toEqual([['a', 'b']]);
+    });
+    
+    test('flushes a partial batch after maxWaitMs', async () => {
+        const batches = [];
+        const batcher = new BatchWindow(async (batch) => batches.push(batch), { maxBatch: 8, maxWaitMs: 5 });
+        
+        batcher.push('a');
+        expect(batches).toEqual([]);
+        
+        await sleep(20);
+        await batcher.pending;
+        expect(batches).toEqual([['a']]);
+    });
+    
+    test('runs batches in input order', async () => {
+        const seen = [];
+        const batcher = new BatchWindow(async (batch) => {
+            // Earlier batches take longer, so ordering comes from chaining
+            await sleep(batch[0] === 1 ? 20 : 0);
+            seen.push(...batch);
+        }, { maxBatch: 2, maxWaitMs: 5 });
+        
+        [1, 2, 3, 4, 5].forEach(item => batcher.push(item));
+        await batcher.flush();
+        
+        expect(seen).toEqual([1, 2, 3, 4, 5]);
+    });
+    
+    test('keeps processing after a batch fails', async () => {
+        const batches = [];
+        const errors = [];
+        const batcher = new BatchWindow(async (batch) => {
+            if (batch.includes('boom')) throw new Error('boom');
+            batches.push(batch);
+        }, { maxBatch: 2, maxWaitMs: 5, onError: (error, batch) => errors.push([error.message, batch]) });
+        
+        ['boom', 'a', 'b', 'c'].forEach(item => batcher.push(item));
+        await batcher.flush();
+        
+        expect(errors).toEqual([['boom', ['boom', 'a']]]);
+        expect(batches).toEqual([['b', 'c']]);
+    });
+    
+    test('after() runs a task between the batches around it', async () => {
+        const seen = [];
+        const batcher = new BatchWindow(async (batch) => seen.push(batch), { maxBatch: 8, maxWaitMs: 5 });
+        
+        batcher.push('a');
+        batcher.after(async () => seen.push('/help'));
+        batcher.push('b');
+        await sleep(20);
+        await batcher.flush();
+        
+        expect(seen).toEqual([['a'], '/help', ['b']]);
+    });
+});
+
+describe('OutputBuffer', () => {
+    const createStream = () => ({ writes: [], write(text) { this.writes.push(text); } });
+    
+    test('coalesces small writes until flushed', () => {
+        const stream = createStream();
+        const output = new OutputBuffer(stream, { flushMs: 1000 });
+        
+        output.write('Hel');
+        output.write('lo');
+        expect(stream.writes).toEqual([]);
+        
+        output.flush();
+        expect(stream.writes).toEqual(['Hello']);
+    });
+    
+    test('flushes at line ends', () => {
+        const stream = createStream();
+        const output = new OutputBuffer(stream, { flushMs: 1000 });
+        
+        output.write('line');
+        output.write(' one\n');
+        
+        expect(stream.writes).toEqual(['line one\n']);
+        output.flush();
+    });
+    
+    test('flushes after flushMs and applies the formatter', async () => {
+        const stream = createStream();
+        const output = new OutputBuffer(stream, { flushMs: 5, format: (text) => text.toUpperCase() });
+        
+        output.write('token');
+        await sleep(20);
+        
+        expect(stream.writes).toEqual(['TOKEN']);
+    });
+    
+    test('flush with nothing buffered writes nothing', () => {
+        const stream = createStream();
+        new OutputBuffer(stream).flush();
+        
+        expect(stream.writes).toEqual([]);
+    });
+});
@@ -0,0 +1,81 @@
+/**
+ * Unit tests for the AI provider helpers
+ */
+
+import { detectProviders, withRetry } from '../src/providers/index.js';
+
+describe('detectProviders', () => {
+    test('matches known key prefixes', () => {
+        expect(detectProviders('AIzaSyExample')).toEqual(['gemini']);
+        expect(detectProviders('xai-example')).toEqual(['grok']);
+        expect(detectProviders('sk-example')).toEqual(['openai', 'deepseek']);
+    });
+    
+    test('returns an empty list for unknown keys', () => {
+        expect(detectProviders('unknown-key')).toEqual([]);
+        expect(detectProviders()).toEqual([]);
+    });
+});
+
+describe('withRetry', () => {
+    // Throws each of the given errors in turn, then resolves
+    const failing = (errors) => jest.fn(async () => {
+        const error = errors.shift();
+        if (error) throw error;
+        return 'ok';
+    });
+    
+    test('retries when the status is only in the Gemini error message', async () => {
+        const fn = failing([
+            new Error('[GoogleGenerativeAI Error]: Error fetching from https://example.test: [503 Service Unavailable] busy'),
+            new Error('[GoogleGenerativeAI Error]: Error fetching from https://example.test: [429 Too Many Requests] slow down')
+        ]);
+        
+        await expect(withRetry(fn, { baseDelayMs: 1 })).resolves.toBe('ok');
+        expect(fn).toHaveBeenCalledTimes(3);
+    });
+    
+    test('retries wrapped network failures', async () => {
+        const fn = failing([
+            new Error('[GoogleGenerativeAI Error]: Error fetching from https://example.test: fetch failed')
+        ]);
+        
+        await expect(withRetry(fn, { baseDelayMs: 1 })).resolves.toBe('ok');
+        expect(fn).toHaveBeenCalledTimes(2);
+    });
+    
+    test('retries errors that carry a status property', async () => {
+        const error = Object.assign(new Error('unavailable'), { status: 502 });
+        const fn = failing([error]);
+        
+        await expect(withRetry(fn, { baseDelayMs: 1 })).resolves.toBe('ok');
+        expect(fn).toHaveBeenCalledTimes(2);
+    });
+    
+    test('does not retry client errors', async () => {
+        const fn = failing([new Error('[400 Bad Request] invalid argument')]);
+        
+        await expect(withRetry(fn, { baseDelayMs: 1 })).rejects.toThrow('400 Bad Request');
+        expect(fn).toHaveBeenCalledTimes(1);
+    });
+    
+    test('gives up after the configured number of retries', async () => {
+        const fn = jest.fn(async () => {
+            throw new Error('[503 Service Unavailable] busy');
+        });
+        
+        await expect(withRetry(fn, { retries: 2, baseDelayMs: 1 })).rejects.toThrow('503');
+        expect(fn).toHaveBeenCalledTimes(3);
+    });
+    
+    test('waits for the server-requested retry delay when given', async () => {
+        const error = Object.assign(new Error('[429 Too Many Requests] quota'), {
+            errorDetails: [{ '@type': 'type.googleapis.com/google.rpc.RetryInfo', retryDelay: '0.05s' }]
+        });
+        const fn = failing([error]);
+        const start = Date.now();
+        
+        await expect(withRetry(fn, { baseDelayMs: 1 })).resolves.toBe('ok');
+        expect(Date.now() - start).toBeGreaterThanOrEqual(45);
+    });
+});